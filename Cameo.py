@@ -20,6 +20,7 @@ class Cameo(object):
     def run(self):
         """ Run the main loop """
         self._windowManager.createWindow()
+        self._captureManager.startPreRoll(seconds = 5.0, jpegQuality = 90)
         while self._windowManager.isWindowCreated:
             self._captureManager.enterFrame()
             frame = self._captureManager.frame
@@ -30,6 +31,7 @@ class Cameo(object):
 
             self._captureManager.exitFrame()
             self._windowManager.processEvents()
+        self._captureManager.stopPreRoll()
 
     def onKeyPress(self, keycode):
         """ 
@@ -37,6 +39,7 @@ class Cameo(object):
 
         Space   -> Take a screenshot
         Tab     -> Start/stop recording a screencast
+        P       -> Save the last few seconds (pre-roll) to a video
         Escape  -> Quit
         """
         if keycode == 32: # Space
@@ -46,6 +49,8 @@ class Cameo(object):
                 self._captureManager.startWritingVideo("screencast.flv")
             else:
                 self._captureManager.stopWritingVideo()
+        elif keycode == ord("p"):
+            self._captureManager.writePreRoll("preroll.flv")
         elif keycode == 27: # Escape
             self._windowManager.destroyWindow()
 
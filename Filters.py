@@ -10,56 +10,6 @@ import cv2
 import numpy
 import Utilities
 
-def recolourRC(source, destination):
-    """
-    Simulate conversion from BGR to RC.
-    The source and destination images must both be in BGR format.
-
-    Blues and greens are replaced with cyans. Psuedocode:
-        destination.blue = destination.green = (source.blue + source.green) / 2
-        destination.red  = source.red
-    """
-    # Extract source image's channels as one-dimensional arrays
-    blue, green, red = cv2.split(source)
-
-    # Replace the blue channel's values with an average of blue and green
-    # addWeighted(source1, weight1, source2, weight2, constant, destination)
-    cv2.addWeighted(blue, 0.5, green, 0.5, 0, blue)
-
-    # Replace the values in our destination image with modified channels
-    # Using blue twice because we want blue and green channels to be equal.
-    cv2.merge((blue, blue, red), destination)
-
-def recolourRGV(source, destination):
-    """
-    Simulate conversion from BGR to RGV.
-    The source and destination images must both be in BGR format.
-
-    Blues are desaturated. Pseudocode:
-    destination.blue  = min(source.blue, source.green, source.red)
-    destination.green = source.green
-    destination.red   = source.red  
-    """
-    blue, green, red = cv2.split(source)
-    cv2.min(blue, green, minimum)
-    cv2.min(minimum, red, blue)
-    cv2.merge((blue, green, red), destination)
-
-def recolourCMV(source, destination):
-    """
-    Simulate conversion from BGR to CMV (cyan, magenta, value).abs
-    Source and destination images must both be in BGR format.abs
-
-    Yellows are desaturated. Pseudocode:
-    destination.blue  = max(source.blue, source.green, source.red)
-    destination.green = source.green
-    destination.red   = source.red
-    """
-    blue, green, red = cv2.split(source)
-    cv2.max(blue, green, maximum)
-    cv2.max(maximum, red, blue)
-    cv2.merge((blue, green, red), destination)
-
 def strokeEdges(source, destination, blurKernelSize = 7, edgeKernelSize = 5):
     """
     Blur the image using medianBlur(), effective in removing digital video noise, especially
@@ -68,7 +18,14 @@ def strokeEdges(source, destination, blurKernelSize = 7, edgeKernelSize = 5):
     For edge-finding, use Laplacian(), produces bold edge lines especially in greyscale image.
     Once we have the edges, we invert the image to get black edges on white background. Then,
     we normalise the image and multiply it with the source image to darken the edges.
+
+    A (N, H, W, C) stack of frames is processed frame by frame.
     """
+    if Utilities.isFrameStack(source):
+        for sourceFrame, destinationFrame in zip(source, destination):
+            strokeEdges(sourceFrame, destinationFrame, blurKernelSize, edgeKernelSize)
+        return
+
     if blurKernelSize >= 3:
         blurredSource = cv2.medianBlur(source, blurKernelSize)
         greySource = cv2.cvtColor(blurredSource, cv2.COLOR_BGR2GRAY)
@@ -91,6 +48,9 @@ class VFuncFilter(object):
     """
     A filter that applies a function to the value (V) channel of
     a greyscale image or to all channels of a colour image.
+
+    The lookup is applied to a flat view, so a contiguous (N, H, W, C) stack
+    of frames is mapped in the same single call as one frame.
     """
     def __init__(self, vFunc = None, dataType = numpy.uint8):
         length = numpy.iinfo(dataType).max + 1
@@ -98,7 +58,7 @@ class VFuncFilter(object):
 
     def apply(self, source, destination):
         """
-        Apply the filter with a BGR or grey source/destination
+        Apply the filter with a BGR or grey source/destination, or a stack of them
         """
         sourceFlatView = Utilities.createFlatView(source)
         destinationFlatView = Utilities.createFlatView(destination)
@@ -112,9 +72,84 @@ class VCurveFilter(VFuncFilter):
     def __init__(self, vPoints, dataType = numpy.uint8):
         VFuncFilter.__init__(self, Utilities.createCurveFunc(vPoints), dataType)
 
+class AutoLevelsFilter(VFuncFilter):
+    """
+    A filter that stretches the value (V) channel of a greyscale image or all channels
+    of a colour image so that the scene's darkest and brightest tones span the full range.
+
+    Each frame, a histogram is computed from a subsample of the pixels and blended into
+    an exponentially weighted moving average (EWMA). The lookup array is only rebuilt when
+    the averaged histogram has drifted far enough from the one it was built from, so most
+    frames cost a subsampled histogram plus the usual lookup.
+
+    A (N, H, W, C) stack counts as N frames: the average is updated once per frame in order,
+    so the curve adapts at the same rate per frame as in a live loop. The whole stack is then
+    mapped with the lookup array as it stands after its last frame.
+    """
+    def __init__(self, clipFraction = 0.005, smoothing = 0.1, threshold = 0.05, sampleStep = 17,
+                 dataType = numpy.uint8):
+        """
+        Args:
+            clipFraction (float): Fraction of samples ignored at each end of the histogram when finding levels
+            smoothing (float): EWMA weight of the newest frame's histogram, between 0 and 1
+            threshold (float): Drift, as the L1 distance between normalised histograms, that triggers a rebuild
+            sampleStep (int): Only every sampleStep-th value is counted. Should not be a multiple of
+                              the number of channels, so that every channel is sampled.
+            dataType: Data type of the images
+        """
+        VFuncFilter.__init__(self, None, dataType)
+        self._length       = numpy.iinfo(dataType).max + 1
+        self._clipFraction = clipFraction
+        self._smoothing    = smoothing
+        self._threshold    = threshold
+        self._sampleStep   = sampleStep
+        self._histogram      = None
+        self._tableHistogram = None
+
+    def apply(self, source, destination):
+        """
+        Apply the filter with a BGR or grey source/destination, or a stack of them
+        """
+        frames = source if Utilities.isFrameStack(source) else (source,)
+        for frame in frames:
+            self._updateHistogram(Utilities.createFlatView(frame)[::self._sampleStep])
+
+        if self._tableHistogram is None or \
+           numpy.abs(self._histogram - self._tableHistogram).sum() > self._threshold:
+            self._updateLookupArray()
+
+        sourceFlatView = Utilities.createFlatView(source)
+        destinationFlatView = Utilities.createFlatView(destination)
+        Utilities.applyLookupArray(self._vLookupArray, sourceFlatView, destinationFlatView)
+
+    def _updateHistogram(self, samples):
+        histogram = numpy.bincount(samples, minlength = self._length).astype(numpy.float64)
+        histogram /= max(samples.size, 1)
+        if self._histogram is None:
+            self._histogram = histogram
+        else:
+            self._histogram *= 1.0 - self._smoothing
+            self._histogram += self._smoothing * histogram
+
+    def _updateLookupArray(self):
+        cumulative = numpy.cumsum(self._histogram)
+        low  = int(numpy.searchsorted(cumulative, self._clipFraction))
+        high = int(numpy.searchsorted(cumulative, 1.0 - self._clipFraction))
+        levelsFunc = Utilities.createLevelsFunc(low, high, self._length)
+        if levelsFunc is None:
+            # A flat scene, leave it as it is
+            levelsFunc = lambda x: x
+        self._vLookupArray = Utilities.createLookupArray(levelsFunc, self._length)
+        self._tableHistogram = self._histogram.copy()
+
 class BGRFuncFilter(object):
     """
     A filter that applies different functions to each of BGR.
+
+    For 8-bit images the three lookup arrays are combined into one 256x1x3 table, so
+    that a single LUT() maps all channels at once, and a (N, H, W, C) stack of frames
+    in the same call through a frame view. Other data types fall back to applying each
+    lookup to a strided view of its channel.
     """
     def __init__(self, vFunc = None, bFunc = None, gFunc = None, rFunc = None, dataType = numpy.uint8):
         length = numpy.iinfo(dataType).max + 1
@@ -122,15 +157,30 @@ class BGRFuncFilter(object):
         self._gLookupArray = Utilities.createLookupArray(Utilities.createCompositeFunc(gFunc, vFunc), length)
         self._rLookupArray = Utilities.createLookupArray(Utilities.createCompositeFunc(rFunc, vFunc), length)
 
+        self._bgrLookupTable = None
+        if dataType == numpy.uint8:
+            # Channels without a function map to themselves
+            identity = numpy.arange(length)
+            lookupArrays = [identity if lookupArray is None else lookupArray
+                            for lookupArray in (self._bLookupArray, self._gLookupArray, self._rLookupArray)]
+            # astype() truncates like assigning the float lookup into a uint8 image does
+            self._bgrLookupTable = numpy.ascontiguousarray(
+                numpy.dstack(lookupArrays).reshape(length, 1, 3).astype(numpy.uint8))
+
     def apply(self, source, destination):
         """
-        Apply the filter with a BGR source/destination
+        Apply the filter with a BGR source/destination, or a stack of them
         """
-        blue, green, red = cv2.split(source)
-        Utilities.applyLookupArray(self._bLookupArray, blue, blue)
-        Utilities.applyLookupArray(self._gLookupArray, green, green)
-        Utilities.applyLookupArray(self._rLookupArray, red, red)
-        cv2.merge([blue, green, red], destination)
+        if self._bgrLookupTable is not None and source.dtype == numpy.uint8:
+            cv2.LUT(Utilities.createFrameView(source), self._bgrLookupTable, Utilities.createFrameView(destination))
+            return
+
+        lookupArrays = (self._bLookupArray, self._gLookupArray, self._rLookupArray)
+        for channel, lookupArray in enumerate(lookupArrays):
+            if lookupArray is not None:
+                Utilities.applyLookupArray(lookupArray, source[..., channel], destination[..., channel])
+            elif destination is not source:
+                destination[..., channel] = source[..., channel]
 
 class BGRCurveFilter(BGRFuncFilter):
     """
@@ -147,15 +197,21 @@ class VConvolutionFilter(object):
     """
     A filter that applies a convolution to the either the value channel (in greyscale) or
     all of BGR.
+
+    A (N, H, W, C) stack of frames is convolved frame by frame, reusing the same kernel.
     """
     def __init__(self, kernel):
         self._kernel = kernel
 
     def apply(self, source, destination):
         """
-        Apply the filter with a BGR or grey source/destination
+        Apply the filter with a BGR or grey source/destination, or a stack of them
         """
-        cv2.filter2D(source, -1, self._kernel, destination)
+        if Utilities.isFrameStack(source):
+            for sourceFrame, destinationFrame in zip(source, destination):
+                cv2.filter2D(sourceFrame, -1, self._kernel, destinationFrame)
+        else:
+            cv2.filter2D(source, -1, self._kernel, destination)
 
 class SharpenFilter(VConvolutionFilter):
     """
@@ -202,6 +258,92 @@ class EmbossFilter(VConvolutionFilter):
 
 # ******************************************************************************************************************* #
 
+## Colour-space filters
+
+class RecolourRCFilter(object):
+    """
+    A filter that simulates conversion from BGR to RC (red, cyan).
+    The source and destination images must both be in BGR format.
+
+    Blues and greens are replaced with cyans. Psuedocode:
+        destination.blue = destination.green = (source.blue + source.green) / 2
+        destination.red  = source.red
+
+    Every output channel is a weighted sum of the input channels, so the whole conversion is
+    a single transform() with a 3x3 matrix instead of a split, an addWeighted() and a merge.
+    """
+    def __init__(self):
+        self._matrix = numpy.array([[0.5, 0.5, 0.0],
+                                    [0.5, 0.5, 0.0],
+                                    [0.0, 0.0, 1.0]], dtype = numpy.float32)
+
+    def apply(self, source, destination):
+        """
+        Apply the filter with a BGR source/destination, or a stack of them
+        """
+        cv2.transform(Utilities.createFrameView(source), self._matrix, Utilities.createFrameView(destination))
+
+class ChannelReductionFilter(object):
+    """
+    A filter that replaces the blue channel of a BGR image with a reduction (such as the
+    minimum or maximum) across all three channels, leaving green and red untouched.
+
+    The reduction is two element-wise calls over strided channel views into a preallocated
+    buffer, which is then written into the destination's blue channel in place. Reducing over
+    the length-3 channel axis instead would run numpy's inner loop once per pixel, which is
+    many times slower. The buffer is only reallocated when the frame size changes.
+    """
+    def __init__(self, reduceFunc):
+        """
+        Args:
+            reduceFunc (func): An element-wise numpy function of two arrays, such as numpy.minimum,
+                               accepting an out argument
+        """
+        self._reduceFunc = reduceFunc
+        self._buffer = None
+
+    def apply(self, source, destination):
+        """
+        Apply the filter with a BGR source/destination, or a stack of them
+        """
+        if self._buffer is None or self._buffer.shape != source.shape[:-1] or self._buffer.dtype != source.dtype:
+            self._buffer = numpy.empty(source.shape[:-1], source.dtype)
+
+        self._reduceFunc(source[..., 0], source[..., 1], out = self._buffer)
+        self._reduceFunc(self._buffer, source[..., 2], out = self._buffer)
+        if destination is not source:
+            # A contiguous copy of the whole frame is cheaper than copying green and red through strided views
+            numpy.copyto(destination, source)
+        destination[..., 0] = self._buffer
+
+class RecolourRGVFilter(ChannelReductionFilter):
+    """
+    A filter that simulates conversion from BGR to RGV (red, green, value).
+    The source and destination images must both be in BGR format.
+
+    Blues are desaturated. Pseudocode:
+        destination.blue  = min(source.blue, source.green, source.red)
+        destination.green = source.green
+        destination.red   = source.red
+    """
+    def __init__(self):
+        ChannelReductionFilter.__init__(self, numpy.minimum)
+
+class RecolourCMVFilter(ChannelReductionFilter):
+    """
+    A filter that simulates conversion from BGR to CMV (cyan, magenta, value).
+    The source and destination images must both be in BGR format.
+
+    Yellows are desaturated. Pseudocode:
+        destination.blue  = max(source.blue, source.green, source.red)
+        destination.green = source.green
+        destination.red   = source.red
+    """
+    def __init__(self):
+        ChannelReductionFilter.__init__(self, numpy.maximum)
+
+# ******************************************************************************************************************* #
+
 ## Film-like filters
 
 class BGRPortraCurveFilter(BGRCurveFilter):
@@ -0,0 +1,235 @@
+##
+##  Golden.py
+##  Occu.py
+##
+##  Golden-image correctness harness for the filters. Each filter is run on Demo/Cameo/Original.png and its
+##  output is compared to a golden image with per-filter tolerances on the maximum and mean absolute error
+##  and on the PSNR. The time each filter took is reported next to its accuracy, so a faster implementation
+##  can be checked against the one it replaces. The exit status is 1 if any filter is out of tolerance.
+##
+##  The screenshots in Demo/Cameo were taken from the live camera feed and are not Original.png filtered
+##  pixel for pixel, so the golden images live in Demo/Cameo/Golden and are generated with --update. Filters
+##  with a plain numpy reference below get their golden image from the reference, the rest from a trusted
+##  implementation of the filter. Stack cases run a filter over a (N, H, W, C) stack of copies of
+##  Original.png and compare every frame to that filter's single-frame golden image.
+##
+##  Usage, from the repository root:
+##      python Golden.py                        Compare every case to its golden image
+##      python Golden.py Portra "Blur (stack)"  Compare only some cases
+##      python Golden.py --record log.jsonl     Also append the results to a JSON lines log
+##      python Golden.py --update RGV CMV       Regenerate some golden images, or all of them without names
+##
+##  Created on October 19, 2026 by Animesh Mishra
+##  Copyright (c) 2026 Animesh Ltd. All Rights Reserved
+##
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy
+import Filters
+
+DEMO_DIRECTORY   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Demo", "Cameo")
+GOLDEN_DIRECTORY = os.path.join(DEMO_DIRECTORY, "Golden")
+
+# Tolerances: (maximum absolute error, mean absolute error, minimum PSNR in dB).
+# Lookup filters should be exact. Convolutions get a little slack for rounding differences
+# between equivalent kernels, e.g. a separable blur. Weighted sums may be off by one level
+# where equivalent implementations round halves differently.
+EXACT       = (0, 0.0, float("inf"))
+ROUNDING    = (1, 0.25, 50.0)
+CONVOLUTION = (2, 0.05, 50.0)
+
+AUTO_LEVELS_CLIP_FRACTION = 0.005
+AUTO_LEVELS_SAMPLE_STEP   = 17
+
+## Plain numpy references
+
+def _referenceRC(source):
+    """destination.blue = destination.green = (source.blue + source.green) / 2, rounded half up"""
+    cyan = ((source[..., 0].astype(numpy.int32) + source[..., 1] + 1) // 2).astype(source.dtype)
+    destination = source.copy()
+    destination[..., 0] = cyan
+    destination[..., 1] = cyan
+    return destination
+
+def _referenceRGV(source):
+    """destination.blue = min(source.blue, source.green, source.red)"""
+    destination = source.copy()
+    destination[..., 0] = source.min(axis = 2)
+    return destination
+
+def _referenceCMV(source):
+    """destination.blue = max(source.blue, source.green, source.red)"""
+    destination = source.copy()
+    destination[..., 0] = source.max(axis = 2)
+    return destination
+
+def _referenceAutoLevels(source):
+    """Stretch the clipped range of a subsampled histogram of the frame to [0, 255]"""
+    samples = source.reshape(-1)[::AUTO_LEVELS_SAMPLE_STEP]
+    cumulative = numpy.cumsum(numpy.bincount(samples, minlength = 256) / float(samples.size))
+    low  = numpy.searchsorted(cumulative, AUTO_LEVELS_CLIP_FRACTION)
+    high = numpy.searchsorted(cumulative, 1.0 - AUTO_LEVELS_CLIP_FRACTION)
+    lookupArray = numpy.clip((numpy.arange(256) - low) * 255.0 / (high - low), 0, 255)
+    return lookupArray.astype(numpy.uint8)[source]
+
+## Cases
+
+class GoldenCase(object):
+    """
+    A filter to check against a golden image.
+    """
+    def __init__(self, name, createFilter, tolerances, reference = None, goldenName = None, stackSize = None):
+        """
+        Args:
+            name (str): Name of the case, and of its golden image unless goldenName is given
+            createFilter (func): Returns the filter's apply function, taking a source and a destination
+            tolerances (tuple): (maximum absolute error, mean absolute error, minimum PSNR in dB)
+            reference (func): Plain numpy reference that produces the golden image from the source
+            goldenName (str): Name of a golden image owned by another case
+            stackSize (int): If provided, the filter is applied to a stack of this many copies of the source
+        """
+        self.name         = name
+        self.createFilter = createFilter
+        self.tolerances   = tolerances
+        self.reference    = reference
+        self.goldenName   = goldenName or name
+        self.stackSize    = stackSize
+
+def _strokeEdgesPortra():
+    portraFilter = Filters.BGRPortraCurveFilter()
+    def apply(source, destination):
+        Filters.strokeEdges(source, destination)
+        portraFilter.apply(destination, destination)
+    return apply
+
+def _autoLevels():
+    return Filters.AutoLevelsFilter(clipFraction = AUTO_LEVELS_CLIP_FRACTION,
+                                    sampleStep = AUTO_LEVELS_SAMPLE_STEP).apply
+
+GOLDEN_CASES = [
+    GoldenCase("Portra",                lambda: Filters.BGRPortraCurveFilter().apply,       EXACT),
+    GoldenCase("Provia",                lambda: Filters.BGRProviaCurveFilter().apply,       EXACT),
+    GoldenCase("Velvia",                lambda: Filters.BGRVelviaCurveFilter().apply,       EXACT),
+    GoldenCase("Cross-Process",         lambda: Filters.BGRCrossProcessCurveFilter().apply, EXACT),
+    GoldenCase("Blur",                  lambda: Filters.BlurFilter().apply,                 CONVOLUTION),
+    GoldenCase("Sharpen",               lambda: Filters.SharpenFilter().apply,              CONVOLUTION),
+    GoldenCase("Edge",                  lambda: Filters.FindEdgesFilter().apply,            CONVOLUTION),
+    GoldenCase("Emboss",                lambda: Filters.EmbossFilter().apply,               CONVOLUTION),
+    GoldenCase("Porta with Dark Edges", _strokeEdgesPortra,                                 CONVOLUTION),
+    GoldenCase("RC",                    lambda: Filters.RecolourRCFilter().apply,           ROUNDING, _referenceRC),
+    GoldenCase("RGV",                   lambda: Filters.RecolourRGVFilter().apply,          EXACT, _referenceRGV),
+    GoldenCase("CMV",                   lambda: Filters.RecolourCMVFilter().apply,          EXACT, _referenceCMV),
+    GoldenCase("Auto-Levels",           _autoLevels,                                        EXACT, _referenceAutoLevels),
+    GoldenCase("Portra (stack)",        lambda: Filters.BGRPortraCurveFilter().apply,       EXACT,
+               goldenName = "Portra", stackSize = 8),
+    GoldenCase("Blur (stack)",          lambda: Filters.BlurFilter().apply,                 CONVOLUTION,
+               goldenName = "Blur", stackSize = 8),
+]
+
+def compareImages(result, golden):
+    """Returns (maximum absolute error, mean absolute error, PSNR in dB) between two images."""
+    if result.shape != golden.shape:
+        raise ValueError("Result is %s but golden image is %s" % (result.shape, golden.shape))
+
+    error = cv2.absdiff(result, golden)
+    maxError = int(error.max())
+    meanError = float(error.mean())
+    meanSquaredError = float(numpy.mean(numpy.square(error, dtype = numpy.float64)))
+    if meanSquaredError == 0:
+        psnr = float("inf")
+    else:
+        peak = numpy.iinfo(result.dtype).max
+        psnr = 10.0 * numpy.log10(peak * peak / meanSquaredError)
+    return maxError, meanError, psnr
+
+def timeFilter(apply, source, repeats):
+    """Apply a filter repeats times, returning the last result and the fastest time in seconds."""
+    destination = numpy.empty_like(source)
+    fastest = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        apply(source, destination)
+        fastest = min(fastest, time.perf_counter() - start)
+    return destination, fastest
+
+def goldenFileName(name):
+    return os.path.join(GOLDEN_DIRECTORY, name + ".png")
+
+def run(names = None, repeats = 5, record = None, update = False):
+    """Run the harness and return True if every filter is within tolerance."""
+    source = cv2.imread(os.path.join(DEMO_DIRECTORY, "Original.png"))
+    if source is None:
+        raise IOError("Could not read Original.png from %s" % DEMO_DIRECTORY)
+
+    if update and not os.path.isdir(GOLDEN_DIRECTORY):
+        os.makedirs(GOLDEN_DIRECTORY)
+
+    passed = True
+    records = []
+    print("%-22s %10s %6s %8s %8s  %s" % ("Filter", "Time (ms)", "Max", "Mean", "PSNR", "Result"))
+    for case in GOLDEN_CASES:
+        if names and case.name not in names:
+            continue
+
+        caseSource = source
+        if case.stackSize is not None:
+            caseSource = numpy.ascontiguousarray(numpy.stack([source] * case.stackSize))
+        result, seconds = timeFilter(case.createFilter(), caseSource, repeats)
+        # Report the time per frame, so that stack cases compare with single frames
+        seconds /= case.stackSize or 1
+
+        if update:
+            if case.goldenName != case.name:
+                continue
+            golden = case.reference(source) if case.reference is not None else result
+            cv2.imwrite(goldenFileName(case.name), golden)
+            print("%-22s %10.2f  written" % (case.name, seconds * 1000))
+            continue
+
+        golden = cv2.imread(goldenFileName(case.goldenName))
+        if golden is None:
+            raise IOError("Missing golden image for %s, run with --update to create it" % case.goldenName)
+
+        # The worst frame decides a stack case
+        resultFrames = result if case.stackSize is not None else [result]
+        errors = [compareImages(resultFrame, golden) for resultFrame in resultFrames]
+        maxError  = max(error[0] for error in errors)
+        meanError = max(error[1] for error in errors)
+        psnr      = min(error[2] for error in errors)
+
+        maxTolerance, meanTolerance, psnrTolerance = case.tolerances
+        withinTolerance = maxError <= maxTolerance and meanError <= meanTolerance and psnr >= psnrTolerance
+        passed = passed and withinTolerance
+        print("%-22s %10.2f %6d %8.4f %8.2f  %s" % (case.name, seconds * 1000, maxError, meanError, psnr,
+                                                    "ok" if withinTolerance else "FAIL"))
+        records.append({"filter":    case.name,
+                        "time":      time.time(),
+                        "seconds":   seconds,
+                        "maxError":  maxError,
+                        "meanError": meanError,
+                        "psnr":      psnr if numpy.isfinite(psnr) else None,
+                        "passed":    withinTolerance})
+
+    if record is not None and records:
+        with open(record, "a") as recordFile:
+            for entry in records:
+                recordFile.write(json.dumps(entry) + "\n")
+
+    return passed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Compare filter outputs to golden images.")
+    parser.add_argument("filters", nargs = "*", help = "names of the cases to check, defaults to all")
+    parser.add_argument("--repeats", type = int, default = 5, help = "runs per case, the fastest is reported")
+    parser.add_argument("--record", default = None, help = "JSON lines file to append the results to")
+    parser.add_argument("--update", action = "store_true", help = "regenerate the golden images")
+    arguments = parser.parse_args()
+
+    if not run(arguments.filters, arguments.repeats, arguments.record, arguments.update):
+        sys.exit(1)
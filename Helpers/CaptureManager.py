@@ -9,6 +9,7 @@
 import cv2
 import numpy
 import time
+from Helpers import PreRollBuffer
 
 class CaptureManager(object):
     """
@@ -45,6 +46,7 @@ class CaptureManager(object):
         self._videoFileName = None
         self._videoEncoding = None
         self._videoWriter   = None
+        self._preRollBuffer = None
 
         self._startTime     = None
         self._framesElapsed = int(0)
@@ -74,6 +76,10 @@ class CaptureManager(object):
     def isWritingVideo(self):
         return self._videoFileName is not None
 
+    @property
+    def isPreRolling(self):
+        return self._preRollBuffer is not None
+
     def enterFrame(self):
         """Capture the next frame, if any."""
         # First check that the previous frame was exited properly
@@ -118,6 +124,10 @@ class CaptureManager(object):
         # Write video to disk
         self._writeVideoFrame()
 
+        # Keep the frame in the pre-roll ring
+        if self.isPreRolling:
+            self._preRollBuffer.push(self._frame)
+
         # Release the frame
         self._frame = None
         self._enteredFrame = False
@@ -137,6 +147,41 @@ class CaptureManager(object):
         self._videoEncoding = None
         self._videoWriter   = None
 
+    def startPreRoll(self, seconds = 5.0, maxBytes = 256 * 1024 * 1024, jpegQuality = None):
+        """
+        Start keeping the last few seconds of exited frames in memory, so that they can be saved after the fact
+        with writePreRoll() or writePreRollFrames().
+
+        Half of maxBytes holds the ring and the other half a pre-roll being written. Raw frames are large, so in
+        raw mode the ring may hold less than the requested seconds, in which case a warning says how much.
+
+        Args:
+            seconds (float): How much footage to keep
+            maxBytes (int): Upper bound on the memory used by stored frames, including a pre-roll being written
+            jpegQuality (int): If provided (0 - 100), frames are stored JPEG-compressed, otherwise raw
+        """
+        self.stopPreRoll()
+        fps = self._capture.get(cv2.CAP_PROP_FPS) if self._capture is not None else 0.0
+        if fps == 0.0:
+            fps = self._fpsEstimate or 30
+        self._preRollBuffer = PreRollBuffer.PreRollBuffer(seconds, maxBytes, jpegQuality, fps)
+
+    def stopPreRoll(self):
+        """Stop keeping exited frames in memory and wait for any pending pre-roll writes"""
+        if self._preRollBuffer is not None:
+            self._preRollBuffer.close()
+            self._preRollBuffer = None
+
+    def writePreRoll(self, fileName, encoding = cv2.VideoWriter_fourcc(*"FLV1")):
+        """Write the pre-roll frames to a video file without blocking the main loop. Dropped if a write is waiting."""
+        if self.isPreRolling:
+            self._preRollBuffer.dumpVideo(fileName, encoding)
+
+    def writePreRollFrames(self, directory):
+        """Write the pre-roll frames to a frame log without blocking the main loop. Dropped if a write is waiting."""
+        if self.isPreRolling:
+            self._preRollBuffer.dumpFrames(directory)
+
     def _writeVideoFrame(self):
         if not self.isWritingVideo:
             return
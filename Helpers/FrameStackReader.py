@@ -0,0 +1,78 @@
+##
+##  FrameStackReader.py
+##  Occu.py
+##
+##  Created on October 19, 2026 by Animesh Mishra
+##  Copyright (c) 2026 Animesh Ltd. All Rights Reserved
+##
+
+import numpy
+
+class FrameStackReader(object):
+    """
+    Reads a VideoCapture in chunks of frames, each delivered as a contiguous (N, H, W, C) stack.
+
+    Frames are decoded straight into one reused stack buffer, so offline processing can hand whole
+    chunks to the filters in Filters.py instead of calling them once per frame:
+
+        reader = FrameStackReader(cv2.VideoCapture("assets/Input.avi"))
+        for stack in reader:
+            curveFilter.apply(stack, stack)
+            for frame in stack:
+                videoWriter.write(frame)
+
+    The stack yielded on each iteration is a view into the buffer and is overwritten by the next
+    chunk, so copy it if it needs to outlive the iteration. The last chunk may hold fewer frames.
+    """
+    def __init__(self, capture, stackSize = 32, frameLimit = None):
+        """
+        Args:
+            capture (VideoCapture): The capture stream to read from
+            stackSize (int): Maximum number of frames per stack
+            frameLimit (int): If provided, stop after reading this many frames in total
+        """
+        self._capture    = capture
+        self._stackSize  = stackSize
+        self._stack      = None
+        self._framesLeft = frameLimit
+
+    def __iter__(self):
+        while True:
+            stack = self.read()
+            if stack is None:
+                return
+            yield stack
+
+    def read(self):
+        """Read the next chunk of frames. Returns None once the capture or the frame limit is exhausted."""
+        stackSize = self._stackSize
+        if self._framesLeft is not None:
+            stackSize = min(stackSize, self._framesLeft)
+            if stackSize <= 0:
+                return None
+
+        if self._stack is None:
+            success, frame = self._capture.read()
+            if not success:
+                return None
+            self._stack = numpy.empty((self._stackSize,) + frame.shape, frame.dtype)
+            self._stack[0] = frame
+            count = 1
+        else:
+            count = 0
+
+        while count < stackSize:
+            success, frame = self._capture.read(self._stack[count])
+            if not success:
+                break
+            if frame.shape != self._stack.shape[1:]:
+                raise ValueError("Frame size changed from %s to %s" % (self._stack.shape[1:], frame.shape))
+            if not numpy.shares_memory(frame, self._stack):
+                self._stack[count] = frame
+            count += 1
+
+        if count == 0:
+            return None
+        if self._framesLeft is not None:
+            self._framesLeft -= count
+        return self._stack[:count]
@@ -0,0 +1,155 @@
+##
+##  KeyframeIndex.py
+##  Occu.py
+##
+##  Created on October 19, 2026 by Animesh Mishra
+##  Copyright (c) 2026 Animesh Ltd. All Rights Reserved
+##
+
+import bisect
+import json
+import os
+
+import cv2
+
+class KeyframeIndex(object):
+    """
+    A persistent index of the keyframe positions and timestamps of a video file.
+
+    Building the index takes one pass over the file in raw (undecoded) mode, which is much cheaper than
+    decoding it. The index is saved next to the video and reused for as long as the video is unchanged.
+    With it, a recording can be split into GOP-aligned segments that decode independently of one
+    another, and a capture can be moved to any timestamp without reading from the start.
+    """
+    def __init__(self, fileName, fps, frameCount, frameSize, keyframes, fileSize = None, modifiedTime = None):
+        """
+        Args:
+            fileName (str): Path of the indexed video
+            fps (float): Frame rate of the video
+            frameCount (int): Number of frames in the video
+            frameSize (tuple): (width, height) of the frames
+            keyframes (list): (frame number, timestamp in milliseconds) pairs, in increasing order
+            fileSize (int): Size of the video when it was indexed, used to detect stale indices
+            modifiedTime (float): Modification time of the video when it was indexed
+        """
+        self.fileName     = fileName
+        self.fps          = fps
+        self.frameCount   = frameCount
+        self.frameSize    = tuple(frameSize)
+        self.keyframes    = [tuple(keyframe) for keyframe in keyframes]
+        self.fileSize     = fileSize
+        self.modifiedTime = modifiedTime
+
+    @staticmethod
+    def indexFileName(fileName):
+        return fileName + ".index.json"
+
+    @classmethod
+    def forVideo(cls, fileName):
+        """Load the saved index of a video, or build and save one if it is missing or out of date."""
+        indexFileName = cls.indexFileName(fileName)
+        if os.path.exists(indexFileName):
+            index = cls.load(indexFileName)
+            if index.isCurrent():
+                return index
+
+        index = cls.scan(fileName)
+        index.save()
+        return index
+
+    @classmethod
+    def scan(cls, fileName, fallbackInterval = 1.0):
+        """
+        Build an index by reading every packet of a video once without decoding it.
+
+        If the capture backend cannot report keyframes, a seek point is recorded every fallbackInterval
+        seconds instead. Seeking still works then, because OpenCV decodes forward from the preceding
+        keyframe, but segments are no longer guaranteed to start on a keyframe.
+        """
+        capture = cv2.VideoCapture(fileName, cv2.CAP_FFMPEG)
+        if not capture.isOpened():
+            raise IOError("Could not open %s" % fileName)
+
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        frameSize = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                     int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        hasKeyframeInfo = capture.set(cv2.CAP_PROP_FORMAT, -1)
+        fallbackFrames = max(1, int(round(fallbackInterval * fps)))
+
+        keyframes = []
+        frameCount = 0
+        while capture.grab():
+            if hasKeyframeInfo:
+                isKeyframe = bool(capture.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))
+            else:
+                isKeyframe = frameCount % fallbackFrames == 0
+            if isKeyframe:
+                keyframes.append((frameCount, capture.get(cv2.CAP_PROP_POS_MSEC)))
+            frameCount += 1
+        capture.release()
+
+        if not keyframes or keyframes[0][0] != 0:
+            keyframes.insert(0, (0, 0.0))
+
+        status = os.stat(fileName)
+        return cls(fileName, fps, frameCount, frameSize, keyframes, status.st_size, status.st_mtime)
+
+    @classmethod
+    def load(cls, indexFileName):
+        with open(indexFileName) as indexFile:
+            return cls(**json.load(indexFile))
+
+    def save(self, indexFileName = None):
+        if indexFileName is None:
+            indexFileName = self.indexFileName(self.fileName)
+        with open(indexFileName, "w") as indexFile:
+            json.dump({"fileName":     self.fileName,
+                       "fps":          self.fps,
+                       "frameCount":   self.frameCount,
+                       "frameSize":    self.frameSize,
+                       "keyframes":    self.keyframes,
+                       "fileSize":     self.fileSize,
+                       "modifiedTime": self.modifiedTime}, indexFile)
+
+    def isCurrent(self):
+        """Returns True if the indexed video still exists and has not changed since it was indexed."""
+        if not os.path.exists(self.fileName):
+            return False
+        status = os.stat(self.fileName)
+        return status.st_size == self.fileSize and status.st_mtime == self.modifiedTime
+
+    def segments(self, count):
+        """
+        Split the video into at most count segments of roughly equal length, each starting on a keyframe.
+        Returns a list of (start frame, end frame) pairs, end exclusive.
+        """
+        keyframeNumbers = [frameNumber for frameNumber, _ in self.keyframes]
+        starts = [0]
+        for i in range(1, count):
+            target = i * self.frameCount // count
+            position = bisect.bisect_right(keyframeNumbers, target) - 1
+            # Pick whichever neighbouring keyframe is closer to the ideal split
+            if position + 1 < len(keyframeNumbers) and \
+               keyframeNumbers[position + 1] - target < target - keyframeNumbers[position]:
+                position += 1
+            if keyframeNumbers[position] > starts[-1] and keyframeNumbers[position] < self.frameCount:
+                starts.append(keyframeNumbers[position])
+
+        ends = starts[1:] + [self.frameCount]
+        return list(zip(starts, ends))
+
+    def frameNumberAt(self, timestamp):
+        """Returns the number of the frame shown at a timestamp, in milliseconds."""
+        position = max(0, bisect.bisect_right([msec for _, msec in self.keyframes], timestamp) - 1)
+        keyframeNumber, keyframeTimestamp = self.keyframes[position]
+        frameNumber = keyframeNumber + int((timestamp - keyframeTimestamp) * self.fps / 1000.0)
+        return min(max(frameNumber, 0), self.frameCount - 1)
+
+    def seek(self, capture, timestamp):
+        """
+        Move a capture of the indexed video to a timestamp, in milliseconds, so that its next read()
+        returns the frame shown at that time. Returns the frame number.
+        """
+        frameNumber = self.frameNumberAt(timestamp)
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frameNumber)
+        return frameNumber
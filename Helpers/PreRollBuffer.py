@@ -0,0 +1,285 @@
+##
+##  PreRollBuffer.py
+##  Occu.py
+##
+##  Created on October 19, 2026 by Animesh Mishra
+##  Copyright (c) 2026 Animesh Ltd. All Rights Reserved
+##
+
+import collections
+import os
+import queue
+import threading
+import time
+import warnings
+
+import cv2
+import numpy
+
+class PreRollBuffer(object):
+    """
+    A bounded ring of the most recent frames, so that footage from just before a trigger can be saved.
+
+    Frames are stored in one of two compact forms:
+        +   Raw frames copied into a preallocated arena. Pushing costs a single memory copy.
+        +   JPEG-compressed frames. Encoding happens on a background thread, so the live loop only pays for
+            handing the frame over. If the encoder falls behind, frames are dropped rather than stalling.
+
+    Either way, the ring never holds frames older than the requested number of seconds. Dumps are queued
+    for a single writer thread, which takes a snapshot of the ring and writes it, so the caller never waits
+    on a copy or on a previous dump. Raw frames are copied into the snapshot one at a time, oldest first,
+    while the ring keeps filling. A frame the live loop overwrites before it is copied is left out. The
+    ring keeps its contents, so every dump holds the last few seconds.
+
+    To keep the total within maxBytes, the ring is limited to half of it and the other half is reserved
+    for the one snapshot being written. At most one further dump can wait behind it. Triggers beyond that
+    are dropped, which loses little because the waiting dump takes its snapshot only when it starts.
+    """
+    def __init__(self, seconds = 5.0, maxBytes = 256 * 1024 * 1024, jpegQuality = None, fps = 30):
+        """
+        Args:
+            seconds (float): How much footage to keep
+            maxBytes (int): Upper bound on the memory used by the ring and a dump in flight together
+            jpegQuality (int): If provided (0 - 100), frames are stored JPEG-compressed, otherwise raw
+            fps (float): Expected frame rate, only used to size the raw arena
+        """
+        self.seconds      = seconds
+        self._ringBytes   = maxBytes // 2
+        self._jpegQuality = jpegQuality
+        self._fps         = fps
+
+        # Guards the ring in both modes
+        self._lock = threading.Lock()
+
+        # Raw storage. Each slot records the sequence number of the frame it holds, so that
+        # the writer can tell whether a slot was overwritten before it could copy it.
+        self._arena          = None
+        self._timestamps     = None
+        self._sequence       = None
+        self._nextSlot       = 0
+        self._slotsFilled    = 0
+        self._framesPushed   = 0
+        self._snapshotBuffer = None
+
+        # Compressed storage
+        self._encoded      = collections.deque()
+        self._encodedBytes = 0
+        self._encodeQueue  = None
+        self._encoder      = None
+
+        self._dumpQueue = queue.Queue(maxsize = 1)
+        self._writer = threading.Thread(target = self._writeDumps)
+        self._writer.daemon = True
+        self._writer.start()
+
+        if self.isCompressed:
+            self._encodeQueue = queue.Queue(maxsize = 4)
+            self._encoder = threading.Thread(target = self._encodeFrames)
+            self._encoder.daemon = True
+            self._encoder.start()
+
+    @property
+    def isCompressed(self):
+        return self._jpegQuality is not None
+
+    def push(self, frame, timestamp = None):
+        """
+        Add a frame to the ring, evicting the oldest frames as needed.
+
+        In compressed mode the frame is handed to the encoder thread as is, so it must not be modified
+        afterwards. CaptureManager retrieves a fresh frame every time, so this holds for its frames.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        if self.isCompressed:
+            try:
+                self._encodeQueue.put_nowait((timestamp, frame))
+            except queue.Full:
+                pass
+            return
+
+        with self._lock:
+            if self._arena is None or self._arena.shape[1:] != frame.shape or self._arena.dtype != frame.dtype:
+                self._allocateArena(frame)
+            self._arena[self._nextSlot] = frame
+            self._timestamps[self._nextSlot] = timestamp
+            self._sequence[self._nextSlot] = self._framesPushed
+            self._framesPushed += 1
+            self._nextSlot = (self._nextSlot + 1) % len(self._arena)
+            self._slotsFilled = min(self._slotsFilled + 1, len(self._arena))
+
+    def dumpVideo(self, fileName, encoding = cv2.VideoWriter_fourcc(*"FLV1"), fps = None):
+        """
+        Write the buffered frames to a video file on the writer thread.
+
+        Args:
+            fileName (str): Path of the video file
+            encoding (int): Four character code of the video codec
+            fps (float): Frame rate of the video. If not provided, it is estimated from the frame timestamps.
+
+        Returns:
+            False if the trigger was dropped because another dump is already waiting, otherwise True
+        """
+        return self._queueDump(self._writeVideo, fileName, encoding, fps)
+
+    def dumpFrames(self, directory):
+        """
+        Write the buffered frames to a frame log on the writer thread: one image per frame plus a
+        frames.log file listing each frame's timestamp. Compressed frames are written without re-encoding.
+
+        Returns:
+            False if the trigger was dropped because another dump is already waiting, otherwise True
+        """
+        return self._queueDump(self._writeFrames, directory)
+
+    def clear(self):
+        """Discard all buffered frames."""
+        with self._lock:
+            self._arena       = None
+            self._timestamps  = None
+            self._sequence    = None
+            self._nextSlot    = 0
+            self._slotsFilled = 0
+            self._encoded.clear()
+            self._encodedBytes = 0
+
+    def close(self):
+        """Stop the encoder and wait for any pending dumps to finish."""
+        if self._encoder is not None:
+            self._encodeQueue.put(None)
+            self._encoder.join()
+            self._encoder = None
+        if self._writer is not None:
+            self._dumpQueue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def _allocateArena(self, frame):
+        wantedSlots = max(1, int(numpy.ceil(self.seconds * self._fps)))
+        fittingSlots = self._ringBytes // frame.nbytes
+        if fittingSlots == 0:
+            raise ValueError("A %d byte frame does not fit in the %d bytes (half of maxBytes) reserved for the raw "
+                             "pre-roll ring" % (frame.nbytes, self._ringBytes))
+        if fittingSlots < wantedSlots:
+            warnings.warn("The raw pre-roll ring only fits %d frames of %s, about %.1f of the %.1f seconds asked "
+                          "for. Raise maxBytes or store frames compressed with jpegQuality."
+                          % (fittingSlots, frame.shape, fittingSlots / float(self._fps), self.seconds))
+
+        slots = min(wantedSlots, fittingSlots)
+        self._arena       = numpy.empty((slots,) + frame.shape, frame.dtype)
+        self._timestamps  = numpy.zeros(slots)
+        self._sequence    = numpy.full(slots, -1, numpy.int64)
+        self._nextSlot    = 0
+        self._slotsFilled = 0
+
+    def _encodeFrames(self):
+        parameters = [int(cv2.IMWRITE_JPEG_QUALITY), int(self._jpegQuality)]
+        while True:
+            item = self._encodeQueue.get()
+            if item is None:
+                return
+            timestamp, frame = item
+            success, data = cv2.imencode(".jpg", frame, parameters)
+            if not success:
+                continue
+            with self._lock:
+                self._encoded.append((timestamp, data))
+                self._encodedBytes += data.nbytes
+                while self._encoded and (self._encodedBytes > self._ringBytes or
+                                         self._encoded[0][0] < timestamp - self.seconds):
+                    _, evicted = self._encoded.popleft()
+                    self._encodedBytes -= evicted.nbytes
+
+    def _snapshot(self):
+        """
+        Return (timestamps, frames) for the buffered frames, oldest first. Runs on the writer thread.
+
+        Raw frames are copied into a reused snapshot buffer one at a time, holding the lock only for one
+        frame's copy, so push() is never held up for long. The oldest frames are copied first, as they are
+        the next to be overwritten. Any frame that is overwritten anyway is left out of the snapshot.
+        """
+        if self.isCompressed:
+            with self._lock:
+                entries = list(self._encoded)
+            return [timestamp for timestamp, _ in entries], [data for _, data in entries]
+
+        with self._lock:
+            arena = self._arena
+            if arena is None or self._slotsFilled == 0:
+                return [], []
+            order = (numpy.arange(self._slotsFilled) + self._nextSlot - self._slotsFilled) % len(arena)
+            latest = self._timestamps[order[-1]]
+            order = order[self._timestamps[order] >= latest - self.seconds]
+            timestamps = self._timestamps[order]
+            sequence = self._sequence[order]
+
+        if self._snapshotBuffer is None or self._snapshotBuffer.shape != arena.shape or \
+           self._snapshotBuffer.dtype != arena.dtype:
+            self._snapshotBuffer = numpy.empty_like(arena)
+
+        copied = []
+        for index, slot in enumerate(order):
+            with self._lock:
+                if self._arena is not arena:
+                    # The frame size changed and the ring was reallocated
+                    break
+                if self._sequence[slot] != sequence[index]:
+                    continue
+                self._snapshotBuffer[len(copied)] = arena[slot]
+            copied.append(index)
+        return timestamps[copied], self._snapshotBuffer[:len(copied)]
+
+    def _decode(self, frame):
+        if self.isCompressed:
+            return cv2.imdecode(frame, cv2.IMREAD_UNCHANGED)
+        return frame
+
+    def _queueDump(self, target, *args):
+        try:
+            self._dumpQueue.put_nowait((target, args))
+        except queue.Full:
+            return False
+        return True
+
+    def _writeDumps(self):
+        # The only thread that takes snapshots, so only one is ever held besides the ring
+        while True:
+            request = self._dumpQueue.get()
+            if request is None:
+                return
+            target, args = request
+            try:
+                timestamps, frames = self._snapshot()
+                if len(frames) > 0:
+                    target(timestamps, frames, *args)
+            except Exception as error:
+                warnings.warn("Could not write the pre-roll: %s" % error)
+
+    def _writeVideo(self, timestamps, frames, fileName, encoding, fps):
+        if fps is None:
+            duration = timestamps[-1] - timestamps[0]
+            fps = (len(frames) - 1) / duration if duration > 0 else self._fps
+
+        videoWriter = None
+        for frame in frames:
+            frame = self._decode(frame)
+            if videoWriter is None:
+                size = (frame.shape[1], frame.shape[0])
+                videoWriter = cv2.VideoWriter(fileName, encoding, fps, size)
+            videoWriter.write(frame)
+        videoWriter.release()
+
+    def _writeFrames(self, timestamps, frames, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        with open(os.path.join(directory, "frames.log"), "w") as log:
+            for index, (timestamp, frame) in enumerate(zip(timestamps, frames)):
+                if self.isCompressed:
+                    fileName = "%06d.jpg" % index
+                    frame.tofile(os.path.join(directory, fileName))
+                else:
+                    fileName = "%06d.png" % index
+                    cv2.imwrite(os.path.join(directory, fileName), frame)
+                log.write("%s %.6f\n" % (fileName, timestamp))
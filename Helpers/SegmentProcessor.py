@@ -0,0 +1,149 @@
+##
+##  SegmentProcessor.py
+##  Occu.py
+##
+##  Filters a long recording in parallel. The recording is split into keyframe-aligned segments,
+##  a pool of worker processes decodes, filters and encodes each segment independently, and the
+##  encoded segments are then joined in order. Joining is only a stream copy if the ffmpeg
+##  command-line tool is on the PATH. Without it, the join re-encodes the whole output in one
+##  process, which does not scale with the number of workers.
+##
+##  Usage, from the repository root:
+##      python -m Helpers.SegmentProcessor assets/Input.avi assets/Output.avi BGRPortraCurveFilter BlurFilter
+##
+##  Created on October 19, 2026 by Animesh Mishra
+##  Copyright (c) 2026 Animesh Ltd. All Rights Reserved
+##
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import warnings
+
+import cv2
+from Helpers import FrameStackReader, KeyframeIndex
+
+def _processSegment(task):
+    """Decode, filter and encode the frames [startFrame, endFrame) of a video. Runs in a worker process."""
+    inputFileName, outputFileName, startFrame, endFrame, filters, encoding, fps, frameSize, stackSize = task
+
+    # Parallelism comes from the worker processes, so one OpenCV thread each avoids oversubscribing the cores
+    cv2.setNumThreads(1)
+    capture = cv2.VideoCapture(inputFileName)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, startFrame)
+    videoWriter = cv2.VideoWriter(outputFileName, encoding, fps, frameSize)
+
+    for stack in FrameStackReader.FrameStackReader(capture, stackSize, endFrame - startFrame):
+        for stage in filters:
+            apply = getattr(stage, "apply", stage)
+            apply(stack, stack)
+        for frame in stack:
+            videoWriter.write(frame)
+
+    videoWriter.release()
+    capture.release()
+    return outputFileName
+
+class SegmentProcessor(object):
+    """
+    Applies a chain of filters to a video file using one worker process per core.
+
+    Each filter in the chain is either a filter object from Filters.py or a function taking a source
+    and a destination, such as Filters.strokeEdges. Filters are applied in place to stacks of frames,
+    and are pickled into each worker, so stateful filters (such as AutoLevelsFilter) keep separate
+    state per segment.
+    """
+    def __init__(self, filters, workers = None, encoding = cv2.VideoWriter_fourcc(*"MJPG"), stackSize = 32):
+        """
+        Args:
+            filters (list): Filters to apply, in order
+            workers (int): Number of worker processes, defaults to the number of cores
+            encoding (int): Four character code of the output codec
+            stackSize (int): Number of frames filtered per call
+        """
+        self.filters    = filters
+        self.workers    = workers or multiprocessing.cpu_count()
+        self._encoding  = encoding
+        self._stackSize = stackSize
+
+    def process(self, inputFileName, outputFileName):
+        """Filter a video file into another, returning the keyframe index of the input."""
+        index = KeyframeIndex.KeyframeIndex.forVideo(inputFileName)
+        # More segments than workers keeps every core busy when segments take uneven time
+        segments = index.segments(self.workers * 4)
+
+        canStreamCopy = shutil.which("ffmpeg") is not None
+        if canStreamCopy:
+            extension = os.path.splitext(outputFileName)[1]
+            segmentEncoding = self._encoding
+        else:
+            warnings.warn("ffmpeg was not found, so segments are written losslessly and then re-encoded into %s "
+                          "in a single process, which does not scale with the number of workers" % outputFileName)
+            extension = ".avi"
+            segmentEncoding = cv2.VideoWriter_fourcc(*"HFYU")
+
+        segmentDirectory = tempfile.mkdtemp(prefix = "segments")
+        try:
+            tasks = [(inputFileName, os.path.join(segmentDirectory, "%06d%s" % (i, extension)), start, end,
+                      self.filters, segmentEncoding, index.fps, index.frameSize, self._stackSize)
+                     for i, (start, end) in enumerate(segments)]
+
+            pool = multiprocessing.Pool(self.workers)
+            try:
+                segmentFileNames = pool.map(_processSegment, tasks, chunksize = 1)
+            finally:
+                pool.close()
+                pool.join()
+
+            if canStreamCopy:
+                self._streamCopy(segmentFileNames, outputFileName)
+            else:
+                self._reencode(segmentFileNames, outputFileName, index)
+        finally:
+            shutil.rmtree(segmentDirectory)
+
+        return index
+
+    def _streamCopy(self, segmentFileNames, outputFileName):
+        """Join encoded segments in order with ffmpeg, without re-encoding them."""
+        listFileName = os.path.join(os.path.dirname(segmentFileNames[0]), "segments.txt")
+        with open(listFileName, "w") as listFile:
+            for segmentFileName in segmentFileNames:
+                listFile.write("file '%s'\n" % os.path.abspath(segmentFileName))
+        result = subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                                 "-i", listFileName, "-c", "copy", outputFileName],
+                                stderr = subprocess.PIPE, universal_newlines = True)
+        if result.returncode != 0:
+            raise RuntimeError("ffmpeg could not join the segments into %s: %s" % (outputFileName, result.stderr))
+
+    def _reencode(self, segmentFileNames, outputFileName, index):
+        """Join losslessly encoded segments in order by decoding them and encoding the output once."""
+        videoWriter = cv2.VideoWriter(outputFileName, self._encoding, index.fps, index.frameSize)
+        for segmentFileName in segmentFileNames:
+            capture = cv2.VideoCapture(segmentFileName)
+            success, frame = capture.read()
+            while success:
+                videoWriter.write(frame)
+                success, frame = capture.read()
+            capture.release()
+        videoWriter.release()
+
+if __name__ == "__main__":
+    import Filters
+
+    parser = argparse.ArgumentParser(description = "Filter a video file in parallel, segment by segment.")
+    parser.add_argument("input", help = "video file to read")
+    parser.add_argument("output", help = "video file to write")
+    parser.add_argument("filters", nargs = "*", help = "names of filter classes or functions in Filters.py")
+    parser.add_argument("--workers", type = int, default = None, help = "number of worker processes")
+    arguments = parser.parse_args()
+
+    filters = []
+    for name in arguments.filters:
+        stage = getattr(Filters, name)
+        filters.append(stage() if isinstance(stage, type) else stage)
+
+    SegmentProcessor(filters, arguments.workers).process(arguments.input, arguments.output)
@@ -39,6 +39,21 @@ def createCurveFunc(points):
 
     return scipy.interpolate.interp1d(arrayX, arrayY, kind, bounds_error = False)
 
+def createLevelsFunc(low, high, length = 256):
+    """
+    Return a function that stretches input values linearly so that low maps to
+    0 and high maps to length - 1. Values outside [low, high] overshoot and are
+    left for createLookupArray() to clamp.
+
+    This is the curve behind auto-levels: low and high are typically the darkest
+    and brightest values that are actually present in a scene.
+    """
+    if high <= low:
+        return None
+
+    scale = float(length - 1) / (high - low)
+    return lambda x: (x - low) * scale
+
 def createCompositeFunc(func0, func1):
     """
     Return a composite of two curves functions. Useful if we want to apply
@@ -67,6 +82,30 @@ def createFlatView(array):
     flatView.shape  = array.size
     return flatView
 
+def isFrameStack(array):
+    """
+    Returns True if the array is a stack of frames with shape (N, H, W, C) rather
+    than a single greyscale (H, W) or colour (H, W, C) frame.
+    """
+    return array.ndim == 4
+
+def createFrameView(array):
+    """
+    Returns a view of a stack of frames as one tall frame, i.e. (N, H, W, C) is
+    seen as (N * H, W, C). A single frame is returned as it is.
+
+    Per-pixel operations such as transform() do not care where one frame ends and
+    the next begins, so they can process a whole stack in a single call through
+    this view. Neighbourhood operations such as filter2D() would bleed across frame
+    boundaries and must be applied frame by frame instead.
+    """
+    if not isFrameStack(array):
+        return array
+
+    frameView       = array.view()
+    frameView.shape = (array.shape[0] * array.shape[1],) + array.shape[2:]
+    return frameView
+
 ##
 ##  The curves function might be expensive and we don't want to run it once per channel,
 ##  per pixel. Fortunately we are typically dealing with just 256 possible input values